@@ -1,26 +1,130 @@
 import os
+import json
+import hashlib
 import time
+import random
 import tempfile
 import threading
-from flask import Flask, request, jsonify, render_template
+import queue
+from typing import Optional
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+import uvicorn
 from langchain_community.document_loaders import WebBaseLoader, PyPDFLoader, UnstructuredWordDocumentLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 from google import genai
+from google.genai import errors as genai_errors
+import httpx
 import faiss
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
 # --- Configuration & Initialization ---
-app = Flask(__name__)
+app = FastAPI()
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+templates = Jinja2Templates(directory=os.path.join(APP_DIR, "templates"))
+
+# Indexed documents are persisted here so a restart does not re-summarize and re-embed everything
+DATA_DIR = os.path.join(APP_DIR, "data")
+INDEX_PATH = os.path.join(DATA_DIR, "index.faiss")
+CHUNKS_PATH = os.path.join(DATA_DIR, "chunks.json")
+META_PATH = os.path.join(DATA_DIR, "meta.json")
+
+# Gemini summaries of uploaded files, keyed by the SHA-256 of the file bytes
+SUMMARY_CACHE_DIR = os.path.join(APP_DIR, "cache", "summary")
 
 # The execution environment provides the key at runtime via an empty string.
 api_key = ""
-client = genai.Client(api_key=api_key)
+# One shared client: the SDK keeps a single pooled HTTP client, so connections are reused across calls.
+# Timeouts are in milliseconds. The default covers greetings and chat answers; summarization of a
+# 15K-character shard returns nothing until the whole (thinking-model) summary is done, so it gets more.
+client = genai.Client(api_key=api_key, http_options={"timeout": 30_000})
+GEMINI_SUMMARY_TIMEOUT_MS = 180_000
+GEMINI_MODEL = "gemini-2.5-flash-preview-09-2025"
+# Only rate limiting, transient server/gateway errors and transport failures (connection resets,
+# timeouts) are retried; anything else surfaces immediately
+GEMINI_RETRYABLE_CODES = {429, 500, 502, 503, 504}
+GEMINI_RETRIES = 5
+
+# Let PyTorch use every core for encode() (it may default to a single thread inside a server worker)
+torch.set_num_threads(int(os.environ.get("TORCH_NUM_THREADS", os.cpu_count() or 4)))
+torch.set_num_interop_threads(1)
+
+# Initialize Embedding Model (multilingual MiniLM, 384-dim)
+# A multilingual encoder maps native-language queries close to the English summaries,
+# so queries no longer need a Gemini translation round-trip before retrieval.
+# ONNX Runtime with the int8 (AVX512-VNNI) export is ~2-3x faster than eager PyTorch on CPU.
+# Set EMBED_BACKEND=torch to opt out; falls back to torch if optimum/onnxruntime is missing.
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "onnx")
+EMBED_ONNX_FILE = os.environ.get("EMBED_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+def load_embed_model(model_name):
+    if EMBED_BACKEND == "onnx":
+        try:
+            return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": EMBED_ONNX_FILE})
+        except Exception as e:
+            print(f"ONNX backend unavailable ({e}), falling back to PyTorch.")
+    return SentenceTransformer(model_name)
+
+EMBED_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+print(f"Loading Embedding Model ({EMBED_MODEL_NAME}, backend={EMBED_BACKEND})...")
+embed_model = load_embed_model(EMBED_MODEL_NAME)
+
+def compile_embed_model(model):
+    """Wraps the PyTorch transformer in torch.compile for fused kernels; returns the eager module (or None)."""
+    if getattr(model, "backend", "torch") != "torch":
+        return None  # ONNX Runtime already runs an optimized graph
+    transformer = model[0]
+    eager_model = transformer.auto_model
+    try:
+        transformer.auto_model = torch.compile(eager_model, mode="reduce-overhead", dynamic=True)
+    except Exception as e:
+        print(f"torch.compile unavailable ({e}), using eager PyTorch.")
+        return None
+    return eager_model
+
+def warm_up_embed_model(model):
+    start = time.perf_counter()
+    # Batch size 1 is specialized separately by torch.compile even with dynamic=True, and every /chat
+    # query is a batch of 1, so both shapes must be compiled here rather than on the request path.
+    model.encode(["warmup"], convert_to_numpy=True)
+    model.encode(["warmup"] * 2, batch_size=2, convert_to_numpy=True)
+    print(f"Embedding model warmed up in {time.perf_counter() - start:.2f}s")
 
-# Initialize Embedding Model (Objective: all-MiniLM-L6-v2)
-print("Loading Embedding Model (all-MiniLM-L6-v2)...")
-embed_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Warm-up: pay kernel selection / graph initialization (and torch.compile) at startup instead of on the first request
+_eager_model = compile_embed_model(embed_model)
+try:
+    warm_up_embed_model(embed_model)
+except Exception as e:
+    if _eager_model is None:
+        raise
+    # Compilation is lazy, so backend failures only surface on the first encode
+    print(f"torch.compile failed ({e}), using eager PyTorch.")
+    embed_model[0].auto_model = _eager_model
+    warm_up_embed_model(embed_model)
+
+# Semantic answer cache: paraphrased queries above this cosine similarity reuse a stored answer
+CACHE_SIMILARITY_THRESHOLD = 0.95
+CACHE_MAX_SIZE = 1000
+
+# Index size ladder: exact float32 flat index until SQ_MIN_TRAIN chunks (enough to train the quantizer),
+# then an int8 scalar-quantized flat index (4x less memory), then an int8 HNSW graph past HNSW_MIN_CHUNKS
+SQ_MIN_TRAIN = 256
+HNSW_MIN_CHUNKS = 10000
+HNSW_M = 32
+
+# Concurrent /chat searches are coalesced into one FAISS call: wait up to 5 ms for up to 32 queries
+SEARCH_BATCH_WINDOW = 0.005
+SEARCH_BATCH_MAX = 32
+RETRIEVAL_TOP_K = 2
+
+# Sources are summarized in shards of this many characters, up to MAX_SUMMARY_SHARDS per source
+SUMMARY_SHARD_SIZE = 15000
+MAX_SUMMARY_SHARDS = 16
 
 # Thread-safe Global Store for Vector Index and Chunks
 class DocState:
@@ -28,82 +132,362 @@ class DocState:
         self.index = None
         self.chunks = []
         self.lock = threading.Lock()
+        self.cache_generation = 0
+        self.reset_cache()
+
+    def clear(self):
+        """Drops all indexed documents and cached answers."""
+        with self.lock:
+            self.index = None
+            self.chunks = []
+            self.reset_cache()
+            for path in (INDEX_PATH, CHUNKS_PATH, META_PATH):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def reset_cache(self):
+        """Drops all cached answers (they are only valid for the current set of documents)."""
+        dimension = embed_model.get_sentence_embedding_dimension()
+        self.cache_index = faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+        self.cached_answers = {}  # cache id -> (language, answer)
+        self.next_cache_id = 0
+        # Answers generated before a reset must not be stored after it (see store_cached_answer)
+        self.cache_generation += 1
 
 state = DocState()
 
+class SearchBatcher:
+    """Background worker that answers queued query embeddings with a single batched index.search."""
+    def __init__(self):
+        self.requests = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def search(self, query_embedding, timeout=10):
+        """Returns the top-k chunk texts for a (1, dim) normalized query embedding."""
+        pending = {"embedding": query_embedding, "event": threading.Event(), "result": None, "error": None}
+        self.requests.put(pending)
+        if not pending["event"].wait(timeout):
+            raise TimeoutError("Vector search timed out.")
+        if pending["error"] is not None:
+            raise pending["error"]
+        return pending["result"]
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.monotonic() + SEARCH_BATCH_WINDOW
+            while len(batch) < SEARCH_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._search_batch(batch)
+
+    def _search_batch(self, batch):
+        try:
+            with state.lock:
+                if state.index is None:
+                    results = [[] for _ in batch]
+                else:
+                    queries = np.vstack([pending["embedding"] for pending in batch])
+                    scores, indices = state.index.search(queries, k=RETRIEVAL_TOP_K)
+                    # FAISS pads missing neighbours with -1
+                    results = [[state.chunks[i] for i in row if 0 <= i < len(state.chunks)] for row in indices]
+            for pending, result in zip(batch, results):
+                pending["result"] = result
+        except Exception as e:
+            for pending in batch:
+                pending["error"] = e
+        for pending in batch:
+            pending["event"].set()
+
+search_batcher = SearchBatcher()
+
 # --- Core Logic & Utility Functions ---
 
-def call_gemini(prompt):
-    """Utility to call Gemini 2.5 Flash with exponential backoff retry logic."""
-    retries = 5
-    for i in range(retries):
+def is_retryable_gemini_error(e):
+    if isinstance(e, httpx.TransportError):
+        return True
+    return isinstance(e, genai_errors.APIError) and e.code in GEMINI_RETRYABLE_CODES
+
+def gemini_backoff(attempt):
+    # Backoff: ~0.25s, 0.5s, 1s, 2s (capped at 5s), jittered so concurrent callers don't retry in lockstep
+    time.sleep(min(5.0, 0.25 * (2 ** attempt) + random.random() * 0.25))
+
+def call_gemini(prompt, timeout_ms=None):
+    """Utility to call Gemini 2.5 Flash with jittered exponential backoff on transient errors.
+
+    timeout_ms overrides the client's default request timeout for this call.
+    """
+    config = {"http_options": {"timeout": timeout_ms}} if timeout_ms else None
+    for i in range(GEMINI_RETRIES):
         try:
             response = client.models.generate_content(
-                model="gemini-2.5-flash-preview-09-2025",
-                contents=prompt
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=config
             )
             return response.text
-        except Exception:
-            if i == retries - 1:
+        except Exception as e:
+            if not is_retryable_gemini_error(e) or i == GEMINI_RETRIES - 1:
                 raise
-            # Backoff: 1s, 2s, 4s, 8s, 16s
-            time.sleep(2**i)
+            gemini_backoff(i)
     return ""
 
-def process_and_index_pipeline(raw_text, source_name):
+def call_gemini_stream(prompt):
+    """Streams Gemini 2.5 Flash output chunk by chunk so the first tokens reach the user early.
+
+    Transient errors are retried like call_gemini until the first text chunk has been yielded;
+    after that a retry would duplicate output, so errors propagate.
     """
-    INTERNAL PIPELINE:
-    1. Summarize and organize using Gemini (Objective Prompt 1).
-    2. Chunk the summary (Size 500, Overlap 50).
-    3. Embed and store in internal FAISS index.
+    for i in range(GEMINI_RETRIES):
+        started = False
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=prompt
+            ):
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+            return
+        except Exception as e:
+            if started or not is_retryable_gemini_error(e) or i == GEMINI_RETRIES - 1:
+                raise
+            gemini_backoff(i)
+
+def sse_wrap(chunks):
+    """Formats text chunks as Server-Sent Events; errors are reported as a final event."""
+    try:
+        for text in chunks:
+            yield f"data: {json.dumps({'delta': text})}\n\n"
+    except Exception as e:
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+def sse_response(chunks):
+    # Starlette iterates sync generators in its threadpool, so Gemini streaming never blocks the event loop
+    return StreamingResponse(sse_wrap(chunks), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@lru_cache(maxsize=256)
+def cached_greeting(lang):
+    """Translates the fixed greeting once per language; repeat requests are served from memory."""
+    prompt = f"Give the text - 'How can I help you?' in {lang} language. Return ONLY the translated text."
+    return call_gemini(prompt).strip()
+
+def lookup_cached_answer(query_embedding, lang):
+    """Returns a cached answer for a semantically equivalent query in the same language, if any."""
+    with state.lock:
+        if state.cache_index.ntotal == 0:
+            return None
+        scores, ids = state.cache_index.search(query_embedding, k=min(4, state.cache_index.ntotal))
+        for score, cache_id in zip(scores[0], ids[0]):
+            if score < CACHE_SIMILARITY_THRESHOLD:
+                break
+            cached_lang, answer = state.cached_answers.get(cache_id, (None, None))
+            if cached_lang == lang:
+                return answer
+    return None
+
+def store_cached_answer(query_embedding, lang, answer, generation):
+    """Adds an answer to the semantic cache, evicting the oldest entry once full (ring buffer).
+
+    generation is state.cache_generation as seen before retrieval; if the cache was reset since
+    (new upload or /clear), the answer was built from old documents and is dropped.
     """
-    if not raw_text or len(raw_text.strip()) < 20:
-        raise Exception("Retrieved content is too short to process.")
+    with state.lock:
+        if generation != state.cache_generation:
+            return
+        cache_id = state.next_cache_id
+        state.next_cache_id += 1
+        evict_id = cache_id - CACHE_MAX_SIZE
+        if evict_id >= 0:
+            state.cache_index.remove_ids(np.array([evict_id], dtype='int64'))
+            state.cached_answers.pop(evict_id, None)
+        state.cache_index.add_with_ids(query_embedding, np.array([cache_id], dtype='int64'))
+        state.cached_answers[cache_id] = (lang, answer)
 
-    # Step 1: High-level Summarization (Internal Objective)
+def summary_prompt_for(text, source_name):
+    """Builds the summarization prompt (Objective Prompt 1) for one shard of a source."""
     # Translation instruction ensures RAG context is always in English for better retrieval accuracy
-    summary_prompt = f"""Here are the contents of a source ({source_name}):
-    {raw_text[:15000]}
+    return f"""Here are the contents of a source ({source_name}):
+    {text}
     
     Summarize and organize the data in an order. If the extracted text language is not English, translate the text into English. 
     Ensure the output is in English so that it should be easy to understand the contents of this website and can be easily understand the routes/sections."""
-    
-    summarized_content = call_gemini(summary_prompt)
-    if not summarized_content:
-        raise Exception("AI Summarization failed.")
+
+def fast_chunk(text, size=500, overlap=50):
+    """Fixed-size overlapping windows via slicing; exact boundaries don't matter for LLM context."""
+    # Stop before a window would lie entirely inside the previous one's overlap
+    return [text[i:i + size] for i in range(0, max(len(text) - overlap, 1), size - overlap)]
+
+def summary_cache_path(digest):
+    return os.path.join(SUMMARY_CACHE_DIR, f"{digest}.txt")
+
+def load_cached_summary(digest):
+    """Returns the stored summary for a content digest, or None if it was never summarized."""
+    path = summary_cache_path(digest)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def save_cached_summary(digest, summary):
+    try:
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        with open(summary_cache_path(digest), "w", encoding="utf-8") as f:
+            f.write(summary)
+    except Exception as e:
+        print(f"Failed to cache summary: {e}")
+
+# Shared GPU resources, allocated once on first use (always under state.lock)
+_gpu_res = None
+
+def is_gpu_index(index):
+    return hasattr(faiss, "GpuIndex") and isinstance(index, faiss.GpuIndex)
+
+def to_gpu_if_available(index):
+    """Moves a CPU index to GPU 0 when CUDA is present. GPU indexes are not thread-safe: use state.lock."""
+    global _gpu_res
+    if faiss.get_num_gpus() == 0:
+        return index
+    if _gpu_res is None:
+        _gpu_res = faiss.StandardGpuResources()
+    return faiss.index_cpu_to_gpu(_gpu_res, 0, index)
+
+def upgrade_index(index):
+    """Moves the index up the size ladder (flat -> int8 flat -> int8 HNSW), re-adding its vectors."""
+    # Brute-force search on GPU stays fast at scale, so GPU indexes are kept as-is
+    if is_gpu_index(index) or isinstance(index, faiss.IndexHNSW):
+        return index
+    if index.ntotal > HNSW_MIN_CHUNKS:
+        new_index = faiss.IndexHNSWSQ(index.d, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        new_index.hnsw.efConstruction = 200
+        new_index.hnsw.efSearch = 64
+    elif index.ntotal >= SQ_MIN_TRAIN and isinstance(index, faiss.IndexFlat):
+        new_index = faiss.IndexScalarQuantizer(index.d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    else:
+        return index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    new_index.train(vectors)
+    new_index.add(vectors)
+    return new_index
+
+def save_index():
+    """Writes the index and chunks to DATA_DIR. Caller must hold state.lock."""
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        index = faiss.index_gpu_to_cpu(state.index) if is_gpu_index(state.index) else state.index
+        faiss.write_index(index, INDEX_PATH)
+        with open(CHUNKS_PATH, "w", encoding="utf-8") as f:
+            json.dump(state.chunks, f, ensure_ascii=False)
+        # Vectors are only comparable with queries embedded by the same model
+        with open(META_PATH, "w", encoding="utf-8") as f:
+            json.dump({"embed_model": EMBED_MODEL_NAME}, f)
+    except Exception as e:
+        # The in-memory index is still valid; only persistence is lost
+        print(f"Failed to save index: {e}")
+
+def load_saved_index():
+    """Restores the index and chunks written by save_index; a missing or corrupt store starts empty."""
+    if not (os.path.exists(INDEX_PATH) and os.path.exists(CHUNKS_PATH)):
+        return
+    try:
+        with open(META_PATH, encoding="utf-8") as f:
+            saved_model = json.load(f).get("embed_model")
+        # Same dimension does not mean same embedding space, so the model itself must match
+        if saved_model != EMBED_MODEL_NAME:
+            raise ValueError(f"built with embedding model {saved_model}, current model is {EMBED_MODEL_NAME}")
+        index = faiss.read_index(INDEX_PATH)
+        with open(CHUNKS_PATH, encoding="utf-8") as f:
+            chunks = json.load(f)
+        if index.ntotal != len(chunks):
+            raise ValueError(f"{index.ntotal} vectors for {len(chunks)} chunks")
+        if index.d != embed_model.get_sentence_embedding_dimension():
+            raise ValueError(f"index dimension {index.d} does not match the embedding model")
+    except Exception as e:
+        print(f"Ignoring saved index ({e}).")
+        return
+    with state.lock:
+        state.index = to_gpu_if_available(index) if isinstance(index, faiss.IndexFlat) else index
+        state.chunks = chunks
+    print(f"Loaded saved index with {len(chunks)} chunks.")
+
+def process_and_index_pipeline(raw_text, source_name, precomputed_summary=None, content_digest=None):
+    """
+    INTERNAL PIPELINE:
+    1. Summarize and organize using Gemini (Objective Prompt 1), unless a precomputed summary is given.
+    2. Chunk the summary (Size 500, Overlap 50).
+    3. Embed and store in internal FAISS index.
+    When content_digest is given, a fresh summary is cached on disk under it.
+    """
+    if precomputed_summary:
+        summarized_content = precomputed_summary
+    else:
+        if not raw_text or len(raw_text.strip()) < 20:
+            raise Exception("Retrieved content is too short to process.")
+
+        # Step 1: High-level Summarization (Internal Objective)
+        # Long sources are split into shards that are summarized concurrently (Gemini calls are I/O-bound)
+        shards = [raw_text[i:i + SUMMARY_SHARD_SIZE] for i in range(0, len(raw_text), SUMMARY_SHARD_SIZE)]
+        shards = shards[:MAX_SUMMARY_SHARDS]
+        def summarize(shard):
+            return call_gemini(summary_prompt_for(shard, source_name), timeout_ms=GEMINI_SUMMARY_TIMEOUT_MS)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(shards))) as executor:
+            summaries = list(executor.map(summarize, shards))
+        
+        summarized_content = "\n".join(s for s in summaries if s)
+        if not summarized_content:
+            raise Exception("AI Summarization failed.")
+        if content_digest:
+            save_cached_summary(content_digest, summarized_content)
 
     # Step 2: Chunking the generated summary
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_documents([Document(page_content=summarized_content)])
+    texts = fast_chunk(summarized_content)
     
     # Step 3: Create Embeddings and store in Index
-    texts = [c.page_content for c in chunks]
-    embeddings = embed_model.encode(texts)
+    # SBERT sorts inputs by length internally, so fixed-size batches carry little padding
+    embeddings = embed_model.encode(texts, batch_size=64, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
     
     with state.lock:
         dimension = embeddings.shape[1]
+        assert embeddings.dtype == np.float32
         if state.index is None:
-            state.index = faiss.IndexFlatL2(dimension)
+            # Inner product over unit vectors == cosine similarity (BLAS-friendly kernel)
+            state.index = to_gpu_if_available(faiss.IndexFlatIP(dimension))
         
-        # FAISS requires float32 numpy arrays
-        state.index.add(np.array(embeddings).astype('float32'))
+        # encode() already returns contiguous float32, so FAISS can take it without a copy
+        state.index.add(embeddings)
+        state.index = upgrade_index(state.index)
         state.chunks.extend(texts)
+        save_index()
+        # New content can change answers, so previously cached ones are no longer valid
+        state.reset_cache()
     
-    return len(chunks)
+    return len(texts)
+
+load_saved_index()
 
-# --- Flask Routes ---
+# --- API Routes ---
+# Endpoints are async; blocking work (scraping, Gemini, embedding, FAISS) runs in the threadpool
+# so a single worker can overlap many in-flight LLM calls.
 
-@app.route('/')
-def home():
+@app.get('/', response_class=HTMLResponse)
+async def home(request: Request):
     """Renders the main dashboard."""
-    return render_template('index.html')
+    return templates.TemplateResponse(request, 'index.html')
 
-@app.route('/upload_url', methods=['POST'])
-def upload_url():
+@app.post('/upload_url')
+async def upload_url(request: Request):
     """Scrapes URL, Summarizes, and Indexes."""
-    url = request.json.get('url')
+    url = (await request.json()).get('url')
     if not url:
-        return jsonify({"error": "No URL provided"}), 400
+        return JSONResponse({"error": "No URL provided"}, status_code=400)
     
     try:
         # Browser-like headers to prevent scraping blocks/403 errors
@@ -111,32 +495,40 @@ def upload_url():
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         loader = WebBaseLoader(web_path=url, header_template=headers)
-        docs = loader.load()
+        docs = await run_in_threadpool(loader.load)
         
         if not docs:
-            return jsonify({"error": "Failed to extract content from URL."}), 400
+            return JSONResponse({"error": "Failed to extract content from URL."}, status_code=400)
             
-        chunk_count = process_and_index_pipeline(docs[0].page_content, url)
-        return jsonify({"message": "URL summarized and indexed successfully.", "count": chunk_count})
+        chunk_count = await run_in_threadpool(process_and_index_pipeline, docs[0].page_content, url)
+        return {"message": "URL summarized and indexed successfully.", "count": chunk_count}
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return JSONResponse({"error": str(e)}, status_code=500)
 
-@app.route('/upload_file', methods=['POST'])
-def upload_file():
+@app.post('/upload_file')
+async def upload_file(file: Optional[UploadFile] = File(None)):
     """Loads PDF/Docs, Extracts text, Summarizes, and Indexes."""
-    if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
+    if file is None:
+        return JSONResponse({"error": "No file part"}, status_code=400)
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
+    if not file.filename:
+        return JSONResponse({"error": "No selected file"}, status_code=400)
 
     suffix = os.path.splitext(file.filename)[1].lower()
     
     try:
+        contents = await file.read()
+
+        # Re-uploads of identical bytes reuse the stored summary, skipping extraction and Gemini
+        digest = hashlib.sha256(contents).hexdigest()
+        cached_summary = load_cached_summary(digest)
+        if cached_summary:
+            chunk_count = await run_in_threadpool(process_and_index_pipeline, None, file.filename, cached_summary)
+            return {"message": f"'{file.filename}' summarized and indexed.", "count": chunk_count}
+
         # Use a secure temp file handling method
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            file.save(tmp.name)
+            tmp.write(contents)
             tmp_path = tmp.name
 
         try:
@@ -148,14 +540,14 @@ def upload_file():
             else:
                 loader = TextLoader(tmp_path)
                 
-            docs = loader.load()
+            docs = await run_in_threadpool(loader.load)
             
             if not docs:
-                return jsonify({"error": "No text could be extracted from this file."}), 400
+                return JSONResponse({"error": "No text could be extracted from this file."}, status_code=400)
 
             full_text = "\n".join([d.page_content for d in docs])
-            chunk_count = process_and_index_pipeline(full_text, file.filename)
-            return jsonify({"message": f"'{file.filename}' summarized and indexed.", "count": chunk_count})
+            chunk_count = await run_in_threadpool(process_and_index_pipeline, full_text, file.filename, None, digest)
+            return {"message": f"'{file.filename}' summarized and indexed.", "count": chunk_count}
         
         finally:
             # Always clean up the temp file
@@ -163,35 +555,35 @@ def upload_file():
                 os.unlink(tmp_path)
                 
     except Exception as e:
-        return jsonify({"error": f"File processing error: {str(e)}"}), 500
+        return JSONResponse({"error": f"File processing error: {str(e)}"}, status_code=500)
 
-@app.route('/get_greeting', methods=['POST'])
-def get_greeting():
+@app.post('/get_greeting')
+async def get_greeting(request: Request):
     """Requirement: Bot asks 'How can I help you?' in the target language."""
-    lang = request.json.get('language', 'English')
-    prompt = f"Give the text - 'How can I help you?' in {lang} language. Return ONLY the translated text."
-    greeting = call_gemini(prompt)
-    return jsonify({"greeting": greeting.strip()})
+    lang = (await request.json()).get('language', 'English')
+    return {"greeting": await run_in_threadpool(cached_greeting, lang.strip().title())}
 
-@app.route('/chat', methods=['POST'])
-def chat():
-    """RAG flow: Query Embedding -> Top-2 Retrieve -> Multilingual Detailed Answer."""
-    data = request.json
+@app.post('/chat')
+async def chat(request: Request):
+    """RAG flow: Query Embedding -> Top-2 Retrieve -> Multilingual Detailed Answer (streamed as SSE)."""
+    data = await request.json()
     query = data.get('message')
     lang = data.get('language', 'English')
 
     if state.index is None or len(state.chunks) == 0:
-        return jsonify({"answer": "I have no data. Please provide a URL or File first."})
+        return sse_response(["I have no data. Please provide a URL or File first."])
 
-    # Step 0: Translate the query to English before embedding to match the English index
-    translation_prompt = f"Translate the following user query to English. If it is already in English, return it exactly as is: {query}"
-    english_query = call_gemini(translation_prompt).strip()
+    # Step 0: Embed the native-language query directly (multilingual encoder, no translation call)
+    query_embedding = await run_in_threadpool(embed_model.encode, [query], convert_to_numpy=True, normalize_embeddings=True)
 
-    # Step 1: Embed English Query and Search (Top 2 retrieval)
-    query_embedding = embed_model.encode([english_query])
-    distances, indices = state.index.search(np.array(query_embedding).astype('float32'), k=2)
-    
-    retrieved_docs = [state.chunks[i] for i in indices[0] if i < len(state.chunks)]
+    # Semantic cache probe: paraphrases of an already answered question skip Gemini entirely
+    cache_generation = state.cache_generation
+    cached_answer = await run_in_threadpool(lookup_cached_answer, query_embedding, lang)
+    if cached_answer is not None:
+        return sse_response([cached_answer])
+
+    # Step 1: Search the English index (Top 2 retrieval, batched with concurrent queries)
+    retrieved_docs = await run_in_threadpool(search_batcher.search, query_embedding)
     context = "\n".join(retrieved_docs)
 
     # Step 2: Detailed Multilingual Response generation (Objective Prompt 2)
@@ -207,16 +599,23 @@ def chat():
     Explain the answer in detail. The final response MUST be in {lang}.
     """
     
-    answer = call_gemini(final_prompt)
-    return jsonify({"answer": answer})
+    def stream_answer():
+        parts = []
+        for text in call_gemini_stream(final_prompt):
+            parts.append(text)
+            yield text
+        # Only complete, non-empty answers are cached
+        if parts:
+            store_cached_answer(query_embedding, lang, "".join(parts), cache_generation)
 
-@app.route('/clear', methods=['POST'])
-def clear_session():
+    return sse_response(stream_answer())
+
+@app.post('/clear')
+async def clear_session():
     """Clears the internal state."""
-    with state.lock:
-        state.index = None
-        state.chunks = []
-    return jsonify({"status": "cleared"})
+    await run_in_threadpool(state.clear)
+    return {"status": "cleared"}
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Document state lives in this process, so run a single worker (uvicorn picks uvloop when installed).
+    uvicorn.run(app, host="127.0.0.1", port=5000)
\ No newline at end of file